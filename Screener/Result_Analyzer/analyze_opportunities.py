@@ -2,6 +2,7 @@
 Standalone Excel Analyzer - Identifies Best Mean Reversion Opportunities
 Reads screening results and scores based on valuation + statistical dislocation
 """
+import numpy as np
 import pandas as pd
 import sys
 from pathlib import Path
@@ -46,113 +47,93 @@ CRITERIA = {
 # SCORING FUNCTIONS
 # ============================================================================
 
-def score_metric(value, optimal_range, acceptable_range):
+def score_metric(values, optimal_range, acceptable_range):
     """
-    Score a metric from 0-100
+    Score a metric column from 0-100
     100 = in optimal range
     50 = in acceptable range but not optimal
-    0 = outside acceptable range
+    0 = outside acceptable range (or missing)
     """
-    if pd.isna(value):
-        return 0
+    values = np.asarray(values, dtype=float)
     
     opt_min, opt_max = optimal_range
     acc_min, acc_max = acceptable_range
     
-    # Perfect score if in optimal range
-    if opt_min <= value <= opt_max:
-        return 100
-    
-    # Partial score if in acceptable range
-    if acc_min <= value <= acc_max:
-        # Linear decay from optimal to acceptable boundary
-        if value < opt_min:
-            distance = opt_min - value
-            max_distance = opt_min - acc_min
-        else:
-            distance = value - opt_max
-            max_distance = acc_max - opt_max
-        
-        return 100 - (distance / max_distance * 50)
+    # Linear decay from optimal to acceptable boundary (only one side is positive)
+    distance_ratio = np.maximum(
+        (opt_min - values) / (opt_min - acc_min),
+        (values - opt_max) / (acc_max - opt_max)
+    )
     
-    # Zero if outside acceptable range
-    return 0
+    optimal = (values >= opt_min) & (values <= opt_max)
+    acceptable = (values >= acc_min) & (values <= acc_max)
+    
+    # NaN fails every comparison, so missing values score 0
+    return np.where(optimal, 100.0, np.where(acceptable, 100 - distance_ratio * 50, 0.0))
 
 
-def calculate_composite_score(row):
-    """Calculate weighted composite score for a stock"""
-    total_score = 0
+def calculate_composite_score(df):
+    """Calculate weighted composite score for every stock, one column at a time"""
+    total_score = np.zeros(len(df))
     total_weight = 0
     
     for metric, params in CRITERIA.items():
-        if metric in row.index:
-            value = row[metric]
+        if metric in df.columns:
             score = score_metric(
-                value,
+                df[metric],
                 params['optimal_range'],
                 params['acceptable_range']
             )
-            weighted_score = score * params['weight']
-            total_score += weighted_score
+            total_score += score * params['weight']
             total_weight += params['weight']
     
     # Normalize to 0-100
     if total_weight > 0:
         return total_score / total_weight
-    return 0
+    return total_score
 
 
 def apply_quality_filters(df):
     """Apply hard filters to remove junk"""
-    filtered = df.copy()
-    
-    # Filter 1: Must have P/E data and be profitable
-    filtered = filtered[filtered['pe_ratio'].notna()]
-    filtered = filtered[filtered['pe_ratio'] > 0]
-    
-    # Filter 2: Must have Z-score data
-    filtered = filtered[filtered['z_score'].notna()]
-    
-    # Filter 3: Must be oversold (Z < -1.5)
-    filtered = filtered[filtered['z_score'] < -1.5]
-    
-    # Filter 4: Not completely broken (drop < -70%)
-    filtered = filtered[filtered['drop_from_high_pct'] > -70]
-    
-    # Filter 5: Has reasonable volume data
-    filtered = filtered[filtered['avg_volume'].notna()]
-    filtered = filtered[filtered['avg_volume'] > 500_000]
-    
-    # Filter 6: Volatility not insane (< 150%)
-    filtered = filtered[filtered['volatility'] < 150]
+    # All filters fused into one boolean mask - a single selection pass
+    mask = (
+        # Filter 1: Must have P/E data and be profitable
+        df['pe_ratio'].notna() & (df['pe_ratio'] > 0)
+        # Filter 2: Must have Z-score data
+        & df['z_score'].notna()
+        # Filter 3: Must be oversold (Z < -1.5)
+        & (df['z_score'] < -1.5)
+        # Filter 4: Not completely broken (drop < -70%)
+        & (df['drop_from_high_pct'] > -70)
+        # Filter 5: Has reasonable volume data
+        & df['avg_volume'].notna() & (df['avg_volume'] > 500_000)
+        # Filter 6: Volatility not insane (< 150%)
+        & (df['volatility'] < 150)
+    )
+    filtered = df[mask].copy()
     
     # Add earnings risk flag
-    def flag_earnings(row):
-        if 'days_to_earnings' in row.index and pd.notna(row['days_to_earnings']):
-            days = row['days_to_earnings']
-            if 0 <= days <= 7:
-                return f'⚠️ {days}d to earnings'
-            elif -7 <= days < 0:
-                return f'Just reported'
-        return ''
+    earnings_risk = pd.Series('', index=filtered.index)
+    if 'days_to_earnings' in filtered.columns:
+        days = filtered['days_to_earnings']
+        upcoming = (days >= 0) & (days <= 7)
+        earnings_risk[upcoming] = '⚠️ ' + days[upcoming].astype(str) + 'd to earnings'
+        earnings_risk[(days >= -7) & (days < 0)] = 'Just reported'
     
-    filtered['earnings_risk'] = filtered.apply(flag_earnings, axis=1)
+    filtered['earnings_risk'] = earnings_risk
     
     return filtered
 
 
 def detect_sector_clustering(df, max_per_sector=3):
     """Flag tickers if too many from same sector"""
-    sector_counts = df['sector'].value_counts()
+    # Broadcast each sector's count onto its rows in one lookup
+    counts = df['sector'].map(df['sector'].value_counts())
+    clustered = counts.where(counts > max_per_sector)
     
-    def flag_cluster(row):
-        if row['sector'] in sector_counts.index:
-            count = sector_counts[row['sector']]
-            if count > max_per_sector:
-                return f'⚠ {count} signals in sector'
-        return ''
-    
-    df['sector_cluster_risk'] = df.apply(flag_cluster, axis=1)
+    df['sector_cluster_risk'] = clustered.map(
+        lambda count: f'⚠ {int(count)} signals in sector' if pd.notna(count) else ''
+    )
     return df
 
 
@@ -183,7 +164,7 @@ def analyze_opportunities(input_file, output_file):
     
     # Calculate composite scores
     print("\nCalculating opportunity scores...")
-    df_filtered['opportunity_score'] = df_filtered.apply(calculate_composite_score, axis=1)
+    df_filtered['opportunity_score'] = calculate_composite_score(df_filtered)
     
     # Sort by score
     df_filtered = df_filtered.sort_values('opportunity_score', ascending=False)
@@ -231,10 +212,13 @@ def analyze_opportunities(input_file, output_file):
     print("SUMMARY")
     print("="*80)
     
+    # One counting pass over the tier column (categorical, so every tier is present)
+    tier_counts = df_filtered['tier'].value_counts()
+    
     print(f"\nTotal opportunities: {len(df_filtered)}")
-    print(f"  STRONG (>70):  {len(df_filtered[df_filtered['tier'] == 'STRONG'])}")
-    print(f"  REVIEW (50-70): {len(df_filtered[df_filtered['tier'] == 'REVIEW'])}")
-    print(f"  PASS (<50):     {len(df_filtered[df_filtered['tier'] == 'PASS'])}")
+    print(f"  STRONG (>70):  {tier_counts['STRONG']}")
+    print(f"  REVIEW (50-70): {tier_counts['REVIEW']}")
+    print(f"  PASS (<50):     {tier_counts['PASS']}")
     
     # Sector breakdown
     print("\nBy Sector:")
@@ -279,7 +263,7 @@ def analyze_opportunities(input_file, output_file):
     
     output_df = df_filtered[output_cols]
     
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+    with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
         # Sheet 1: All ranked opportunities
         output_df.to_excel(writer, sheet_name='Ranked Opportunities', index=False)
         
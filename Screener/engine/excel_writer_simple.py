@@ -1,70 +1,76 @@
 """Excel output - enhanced with P/E and Z-score columns"""
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+# Column order for easy scanning
+COLUMN_ORDER = (
+    'ticker',
+    'signal',                    # NEW: OVERSOLD/OVERBOUGHT/NEUTRAL
+    'z_score',                   # NEW: Statistical deviation
+    'distance_from_mean_pct',    # NEW: % from rolling mean
+    'pe_ratio',                  # NEW: P/E for survivability check
+    'forward_pe',                # NEW: Forward P/E
+    'sector',                    # NEW: Sector
+    'days_to_earnings',          # NEW: Days until earnings
+    'earnings_date',             # NEW: Earnings date
+    'current_price', 
+    'recent_high',
+    'drop_from_high_pct',
+    'p10',
+    'volatility',
+    'p5',
+    'p50',
+    'avg_volume',                # NEW: Volume filter
+)
+
 def write_results_to_excel(results, output_path):
     """
     Write screening results to Excel
     Now includes P/E, sector, and Z-score for mean reversion
+    Accepts the list of result dicts or a DataFrame already built from it
     """
     # Create output directory if it doesn't exist
     output_dir = Path(output_path).parent
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    df = pd.DataFrame(results)
-    
-    # Filter successful results
-    df = df[df['success'] == True].copy()
+    if isinstance(results, pd.DataFrame):
+        # Caller already built the frame - reuse it instead of rebuilding
+        df = results[results['success'] == True] if 'success' in results.columns else results
+    else:
+        # Filter successful results before building the frame
+        df = pd.DataFrame([r for r in results if r.get('success')])
     
     if len(df) == 0:
         print("No successful results to save")
         return
     
-    # Sort by Z-score (most oversold first for mean reversion opportunities)
-    df = df.sort_values('z_score')
-    
-    # Reorder columns for easy scanning
-    column_order = [
-        'ticker',
-        'signal',                    # NEW: OVERSOLD/OVERBOUGHT/NEUTRAL
-        'z_score',                   # NEW: Statistical deviation
-        'distance_from_mean_pct',    # NEW: % from rolling mean
-        'pe_ratio',                  # NEW: P/E for survivability check
-        'forward_pe',                # NEW: Forward P/E
-        'sector',                    # NEW: Sector
-        'days_to_earnings',          # NEW: Days until earnings
-        'earnings_date',             # NEW: Earnings date
-        'current_price', 
-        'recent_high',
-        'drop_from_high_pct',
-        'p10',
-        'volatility',
-        'p5',
-        'p50',
-        'avg_volume',                # NEW: Volume filter
-    ]
-    
     # Only include columns that exist
-    available_cols = [col for col in column_order if col in df.columns]
-    df = df[available_cols]
+    available_cols = [col for col in COLUMN_ORDER if col in df.columns]
+    
+    # Sort by Z-score (most oversold first for mean reversion opportunities)
+    # One argsort on the raw values, then a single positional take
+    order = np.argsort(df['z_score'].to_numpy(dtype=float), kind='stable')
+    df = df[available_cols].iloc[order]
     
     # Write to Excel
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+    # xlsxwriter is write-only and serializes rows faster than openpyxl
+    with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
         # Main sheet
         df.to_excel(writer, index=False, sheet_name='All Results')
         
         # Sheet 2: Oversold opportunities (Z < -2)
-        oversold = df[df['signal'] == 'OVERSOLD'].copy()
+        oversold = df[df['signal'] == 'OVERSOLD']
         if len(oversold) > 0:
             oversold.to_excel(writer, index=False, sheet_name='Oversold')
         
         # Sheet 3: Overbought (Z > 2)
-        overbought = df[df['signal'] == 'OVERBOUGHT'].copy()
+        overbought = df[df['signal'] == 'OVERBOUGHT']
         if len(overbought) > 0:
             overbought.to_excel(writer, index=False, sheet_name='Overbought')
     
     print(f"\nResults saved to: {output_path}")
     print(f"Sorted by Z-score (most oversold first)")
     print(f"  - Total results: {len(df)}")
-    print(f"  - Oversold signals: {len(df[df['signal'] == 'OVERSOLD'])}")
-    print(f"  - Overbought signals: {len(df[df['signal'] == 'OVERBOUGHT'])}")
\ No newline at end of file
+    print(f"  - Oversold signals: {len(oversold)}")
+    print(f"  - Overbought signals: {len(overbought)}")
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""Batched price history - one yf.download call per batch of tickers"""
+import random
+import time
+import yfinance as yf
+import mc_cache
+from mc_data import history_cache_name, history_start_date  # MC Engine path is set up by screener_engine_simple
+
+
+RETRY_ATTEMPTS = 3
+RETRY_MAX_WAIT = 10  # seconds
+
+
+def get_history_batch(tickers, historical_window, refresh=False):
+    """
+    Get price history for a batch of tickers
+    Today's cached histories are reused; the rest come from a single request
+    Returns {ticker: DataFrame} shaped like mc_data.download_data output
+    Tickers with no data are left out
+    """
+    histories = {}
+    missing = []
+    
+    for ticker in tickers:
+        cached = None if refresh else mc_cache.load_cached(history_cache_name(ticker, historical_window))
+        if cached is not None:
+            histories[ticker] = cached
+        else:
+            missing.append(ticker)
+    
+    if missing:
+        downloaded = _download_batch(missing, historical_window)
+        for ticker, stock_data in downloaded.items():
+            mc_cache.save_cached(history_cache_name(ticker, historical_window), stock_data)
+        histories.update(downloaded)
+    
+    return histories
+
+
+def _download_batch(tickers, historical_window):
+    """One grouped yf.download for the batch, split into per-ticker frames"""
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        data = yf.download(
+            tickers,
+            start=history_start_date(historical_window),
+            progress=False,
+            auto_adjust=True,
+            group_by='ticker',
+            threads=True
+        )
+        
+        # A fully empty batch means Yahoo is throttling - back off (full jitter) and retry
+        if data is not None and len(data) > 0:
+            break
+        if attempt < RETRY_ATTEMPTS:
+            time.sleep(random.uniform(0, min(RETRY_MAX_WAIT, 2 ** attempt)))
+    
+    histories = {}
+    if data is None or len(data) == 0:
+        return histories
+    
+    available = set(data.columns.get_level_values(0))
+    for ticker in tickers:
+        if ticker not in available:
+            continue
+        
+        # Batch frames share one date index - drop days this ticker didn't trade
+        stock_data = data[ticker].dropna(how='all')
+        if len(stock_data) > 0:
+            histories[ticker] = stock_data
+    
+    return histories
@@ -3,83 +3,171 @@ Simple Enhanced Screener - Adds P/E and Z-score to existing Monte Carlo analysis
 Minimal modifications to existing code
 """
 import sys
+import atexit
+import multiprocessing
+import random
+import time
 from pathlib import Path
 import yfinance as yf
+try:
+    from yfinance.exceptions import YFRateLimitError
+except ImportError:
+    # Older yfinance has no rate-limit exception - nothing to retry on
+    class YFRateLimitError(Exception):
+        pass
 import numpy as np
 from datetime import date, timedelta
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 # Add MC Engine to path
 mc_engine_path = Path("/Users/jazzhashzzz/Documents/Market_Analysis_files/Tail End Risk/Mc Engine")
 sys.path.insert(0, str(mc_engine_path))
 
 from monte_carlo_risk_engine import MonteCarloRiskEngine
+from mc_data import download_data
+import mc_cache
 import warnings
 warnings.filterwarnings('ignore')
 
 
+# Fundamentals memo - each ticker's .info is fetched once per day
+# Persisted to disk so intra-day reruns skip the network entirely
+_FUNDAMENTALS_CACHE = mc_cache.load_cached('fundamentals') or {}
+
+_EMPTY_FUNDAMENTALS = {
+    'pe_ratio': None,
+    'forward_pe': None,
+    'sector': 'Unknown',
+    'avg_volume': None,
+    'earnings_date': None,
+    'days_to_earnings': None,
+}
+
+
+def _save_fundamentals_cache():
+    # Screener worker processes hold a stale copy - only the parent writes it
+    if multiprocessing.parent_process() is not None:
+        return
+    mc_cache.save_cached('fundamentals', _FUNDAMENTALS_CACHE)
+
+atexit.register(_save_fundamentals_cache)
+
+# Fundamentals prefetch pool size - beyond this Yahoo starts rate limiting
+MAX_CONCURRENT_REQUESTS = 16
+
+RETRY_ATTEMPTS = 3
+RETRY_MAX_WAIT = 10  # seconds
+
+
+def _fetch_fundamentals(ticker):
+    """Download P/E, Forward P/E, sector, earnings date from yfinance"""
+    stock = yf.Ticker(ticker)
+    info = stock.info
+    
+    # Get earnings date
+    earnings_date = None
+    days_to_earnings = None
+    try:
+        calendar = stock.calendar
+        if calendar is not None and 'Earnings Date' in calendar.index:
+            earnings_date = calendar.loc['Earnings Date'][0]
+            
+            # Calculate days until earnings
+            from datetime import datetime
+            if pd.notna(earnings_date):
+                today = datetime.now()
+                if isinstance(earnings_date, str):
+                    earnings_dt = pd.to_datetime(earnings_date)
+                else:
+                    earnings_dt = earnings_date
+                
+                days_to_earnings = (earnings_dt - today).days
+    except:
+        pass
+    
+    return {
+        'pe_ratio': info.get('trailingPE', None),
+        'forward_pe': info.get('forwardPE', None),
+        'sector': info.get('sector', 'Unknown'),
+        'avg_volume': info.get('averageVolume', None),
+        'earnings_date': earnings_date,
+        'days_to_earnings': days_to_earnings,
+    }
+
+
+def _fetch_fundamentals_with_retry(ticker):
+    """
+    _fetch_fundamentals with retries
+    Rate-limited calls back off exponentially with full jitter before retrying
+    """
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        try:
+            return _fetch_fundamentals(ticker)
+        except YFRateLimitError:
+            if attempt == RETRY_ATTEMPTS:
+                raise
+            time.sleep(random.uniform(0, min(RETRY_MAX_WAIT, 2 ** attempt)))
+
+
 def get_simple_fundamentals(ticker):
     """Get basic valuation metrics - P/E, Forward P/E, sector, earnings date"""
+    cached = _FUNDAMENTALS_CACHE.get(ticker)
+    if cached is not None:
+        return cached
+    
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        # Get earnings date
-        earnings_date = None
-        days_to_earnings = None
-        try:
-            calendar = stock.calendar
-            if calendar is not None and 'Earnings Date' in calendar.index:
-                earnings_date = calendar.loc['Earnings Date'][0]
-                
-                # Calculate days until earnings
-                from datetime import datetime
-                if pd.notna(earnings_date):
-                    today = datetime.now()
-                    if isinstance(earnings_date, str):
-                        earnings_dt = pd.to_datetime(earnings_date)
-                    else:
-                        earnings_dt = earnings_date
-                    
-                    days_to_earnings = (earnings_dt - today).days
-        except:
-            pass
-        
-        return {
-            'pe_ratio': info.get('trailingPE', None),
-            'forward_pe': info.get('forwardPE', None),
-            'sector': info.get('sector', 'Unknown'),
-            'avg_volume': info.get('averageVolume', None),
-            'earnings_date': earnings_date,
-            'days_to_earnings': days_to_earnings,
-        }
+        fundamentals = _fetch_fundamentals_with_retry(ticker)
+        _FUNDAMENTALS_CACHE[ticker] = fundamentals
     except:
-        return {
-            'pe_ratio': None,
-            'forward_pe': None,
-            'sector': 'Unknown',
-            'avg_volume': None,
-            'earnings_date': None,
-            'days_to_earnings': None,
-        }
+        # Failed lookups are not cached - retry on the next call
+        fundamentals = dict(_EMPTY_FUNDAMENTALS)
+    
+    return fundamentals
+
+
+def prefetch_fundamentals(tickers, max_workers=MAX_CONCURRENT_REQUESTS, refresh=False):
+    """
+    Fetch fundamentals for all tickers concurrently
+    Each lookup is a blocking .info round-trip, so threads overlap the network wait
+    refresh=True ignores today's cached values and fetches everything again
+    Returns dict of ticker -> fundamentals
+    """
+    if refresh:
+        _FUNDAMENTALS_CACHE.clear()
+    
+    fundamentals = {}
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(get_simple_fundamentals, t): t for t in tickers}
+        for future in as_completed(futures):
+            fundamentals[futures[future]] = future.result()
+    finally:
+        # On Ctrl+C drop the queued lookups instead of waiting for all of them
+        executor.shutdown(wait=False, cancel_futures=True)
 
+    return fundamentals
 
-def get_z_score(ticker, lookback_days=60):
+
+def get_z_score(ticker, lookback_days=60, hist_data=None):
     """
     Calculate Z-score for mean reversion signal
     Z = (Current Price - Rolling Mean) / Rolling Std
+    Pass already-downloaded history to skip the download
     """
     try:
-        # Try to get more data buffer for safety
-        end_date = date.today()
-        start_date = end_date - timedelta(days=lookback_days + 50)
-        
-        hist_data = yf.download(
-            ticker, 
-            start=start_date, 
-            end=end_date, 
-            progress=False,
-            timeout=10
-        )
+        if hist_data is None:
+            # Try to get more data buffer for safety
+            end_date = date.today()
+            start_date = end_date - timedelta(days=lookback_days + 50)
+            
+            hist_data = yf.download(
+                ticker, 
+                start=start_date, 
+                end=end_date, 
+                progress=False,
+                timeout=10
+            )
         
         # Need minimum 30 days of data
         if hist_data is None or len(hist_data) < 30:
@@ -87,12 +175,12 @@ def get_z_score(ticker, lookback_days=60):
         
         # Use whatever data we have (minimum 30, target 60)
         actual_lookback = min(lookback_days, len(hist_data))
-        recent_data = hist_data.tail(actual_lookback)
+        recent_closes = np.asarray(hist_data['Close'], dtype=float).ravel()[-actual_lookback:]
         
-        # Price-based Z-score
-        rolling_mean = float(recent_data['Close'].mean())
-        rolling_std = float(recent_data['Close'].std())
-        current_price = float(recent_data['Close'].iloc[-1])
+        # Price-based Z-score - plain reductions over the tail window
+        rolling_mean = float(np.nanmean(recent_closes))
+        rolling_std = float(np.nanstd(recent_closes, ddof=1))
+        current_price = float(recent_closes[-1])
         
         if rolling_std > 0 and rolling_mean > 0:
             z_score = (current_price - rolling_mean) / rolling_std
@@ -118,17 +206,26 @@ def get_z_score(ticker, lookback_days=60):
         return None
 
 
-def analyze_stock(ticker, days_to_simulate=90, num_simulations=10000, historical_window=252*6):
+def analyze_stock(ticker, days_to_simulate=90, num_simulations=10000, historical_window=252*6,
+                  fundamentals=None, stock_data=None, seed=42, refresh=False):
     """
     Enhanced analysis - adds P/E and Z-score to existing Monte Carlo
     Drop-in replacement for original analyze_stock function
+    Pass prefetched fundamentals / price history to skip the per-ticker downloads
+    seed is handed to the engine (e.g. a SeedSequence child per ticker)
+    refresh=True makes the per-ticker fallback download skip today's cache
     """
     try:
-        # Get fundamentals
-        fundamentals = get_simple_fundamentals(ticker)
+        # Get fundamentals (unless already prefetched)
+        if fundamentals is None:
+            fundamentals = get_simple_fundamentals(ticker)
+        
+        # No batch history - one (daily-cached) download shared by the Z-score and the engine
+        if stock_data is None:
+            stock_data = download_data(ticker, historical_window, refresh=refresh, verbose=False)
         
         # Get Z-score
-        z_data = get_z_score(ticker)
+        z_data = get_z_score(ticker, hist_data=stock_data)
         
         # Set defaults if Z-score calculation failed
         if z_data:
@@ -143,21 +240,20 @@ def analyze_stock(ticker, days_to_simulate=90, num_simulations=10000, historical
         # Run existing Monte Carlo analysis
         engine = MonteCarloRiskEngine(
             stock_symbol=ticker,
-            starting_capital=1000,
             days_to_simulate=days_to_simulate,
             num_simulations=num_simulations,
             historical_window=historical_window,
-            max_tolerable_loss_pct=80
+            stock_data=stock_data,
+            seed=seed,
+            verbose=False  # One status line per ticker is printed by the caller
         )
         
-        # Get 52-week high (existing logic)
+        # Get 52-week high from the history already loaded (last 252 sessions)
         try:
-            end_date = date.today()
-            start_date = end_date - timedelta(days=365)
-            hist_data = yf.download(ticker, start=start_date, end=end_date, progress=False)
+            hist_data = engine.stock_data.iloc[-252:]
             
             if len(hist_data) > 0:
-                recent_high = float(hist_data['High'].max())
+                recent_high = float(np.nanmax(np.asarray(hist_data['High'], dtype=float)))
                 drop_from_high_pct = ((engine.stock_price - recent_high) / recent_high) * 100
             else:
                 recent_high = engine.stock_price
@@ -166,10 +262,11 @@ def analyze_stock(ticker, days_to_simulate=90, num_simulations=10000, historical
             recent_high = engine.stock_price
             drop_from_high_pct = 0.0
         
-        # Extract percentiles (existing logic)
-        p5 = engine.stock_percentiles[engine.stock_percentiles['percentile'] == 5]['return'].values[0]
-        p10 = engine.stock_percentiles[engine.stock_percentiles['percentile'] == 10]['return'].values[0]
-        p50 = engine.stock_percentiles[engine.stock_percentiles['percentile'] == 50]['return'].values[0]
+        # Extract percentiles - index the table once instead of a mask per level
+        return_at = engine.stock_percentiles.set_index('percentile')['return']
+        p5 = return_at.loc[5]
+        p10 = return_at.loc[10]
+        p50 = return_at.loc[50]
         
         # Build result with new metrics added
         return {
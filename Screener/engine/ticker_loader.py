@@ -5,17 +5,10 @@ def load_tickers(filepath):
     """
     Load tickers from tab-separated file
     Format: ticker\tvolume
-    Returns list of ticker symbols
+    Returns list of unique ticker symbols (first occurrence order)
     """
-    tickers = []
-    
     with open(filepath, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                parts = line.split('\t')
-                if parts:
-                    ticker = parts[0].strip().upper()
-                    tickers.append(ticker)
+        tickers = [line.strip().split('\t', 1)[0].strip().upper() for line in f if line.strip()]
     
-    return tickers
\ No newline at end of file
+    # Order-preserving dedupe - repeated rows would be analyzed twice
+    return list(dict.fromkeys(tickers))
\ No newline at end of file
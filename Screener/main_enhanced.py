@@ -2,17 +2,24 @@
 Monte Carlo Stock Screener - Enhanced with P/E and Z-Score
 Analyzes all stocks in ticker.txt and outputs to Excel
 """
+import os
 import sys
 import signal
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
+import numpy as np
+import pandas as pd
 
 # Add engine directory to path
 engine_path = Path(__file__).parent / "engine"
 sys.path.insert(0, str(engine_path))
 
 from engine.ticker_loader import load_tickers
-from engine.screener_engine_simple import analyze_stock  # Updated import
+from engine.screener_engine_simple import analyze_stock, prefetch_fundamentals  # Updated import
+from engine.price_cache import get_history_batch
 from engine.excel_writer_simple import write_results_to_excel  # Updated import
+import mc_cache  # MC Engine path is set up by screener_engine_simple
 
 # ============================================================================
 # CONFIGURATION
@@ -24,126 +31,263 @@ OUTPUT_FILE = "/Users/jazzhashzzz/Documents/Market_Analysis_files/output/screene
 DAYS_TO_SIMULATE = 90
 NUM_SIMULATIONS = 10000
 HISTORICAL_WINDOW = 252*6
-
-# Global results list for signal handler
-RESULTS = []
+SEED = 42  # Root seed - each ticker gets its own spawned stream
+BATCH_SIZE = 200  # Tickers per batched price download
+MAX_WORKERS = min(os.cpu_count() or 1, 8)  # Worker processes - one per core, capped
 
 # ============================================================================
-# SIGNAL HANDLER FOR CTRL+C
+# RUN STATE (saves partial results on Ctrl+C)
 # ============================================================================
 
-def signal_handler(sig, frame):
-    """Save results when user hits Ctrl+C"""
-    print("\n\n" + "="*80)
-    print("INTERRUPTED - Saving partial results...")
-    print("="*80)
+class ScreenerRun:
+    """Collects results for one screening run and saves them if it is cut short"""
+    
+    def __init__(self, output_file, save_interval=100):
+        self.output_file = output_file
+        self.checkpoint_file = Path(output_file).with_suffix('.checkpoint.csv')
+        self.save_interval = save_interval
+        self.results = []
+        self._checkpointed = 0  # Results already in the checkpoint file
+        self._previous_handler = None
+    
+    def __enter__(self):
+        # Ctrl+C handling lives only as long as the run
+        self._previous_handler = signal.signal(signal.SIGINT, self._handle_interrupt)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        signal.signal(signal.SIGINT, self._previous_handler)
+        
+        # Crashed mid-run - keep what we have
+        if exc_type is not None and issubclass(exc_type, Exception):
+            print(f"\nError during screening: {exc}")
+            self.save()
+        return False
     
-    if RESULTS:
+    def add(self, result):
+        self.results.append(result)
+    
+    def save(self):
+        """Write everything collected so far"""
+        if not self.results:
+            print("No results to save")
+            return
         try:
-            write_results_to_excel(RESULTS, OUTPUT_FILE)
-            print(f"\nSaved {len(RESULTS)} results before exit")
+            write_results_to_excel(self.results, self.output_file)
+            print(f"\nSaved {len(self.results)} results")
         except Exception as e:
             print(f"Error saving: {e}")
-    else:
-        print("No results to save")
     
-    sys.exit(0)
+    def autosave(self, completed):
+        """
+        Periodic checkpoint every save_interval stocks
+        Plain CSV - the formatted workbook is only written at the end
+        Append-only: each checkpoint writes just the rows added since the last one
+        """
+        if completed % self.save_interval == 0 and len(self.results) > self._checkpointed:
+            print(f"\n[Auto-saving progress: {len(self.results)} stocks completed -> {self.checkpoint_file.name}]")
+            try:
+                self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+                # First checkpoint of the run starts a fresh file with the header
+                first = self._checkpointed == 0
+                pd.DataFrame(self.results[self._checkpointed:]).to_csv(
+                    self.checkpoint_file, index=False, mode='w' if first else 'a', header=first
+                )
+                self._checkpointed = len(self.results)
+            except Exception as e:
+                print(f"Warning: Auto-save failed: {e}")
+    
+    def _handle_interrupt(self, sig, frame):
+        """Save results when user hits Ctrl+C"""
+        print("\n\n" + "="*80)
+        print("INTERRUPTED - Saving partial results...")
+        print("="*80)
+        
+        self.save()
+        sys.exit(0)
+
+# ============================================================================
+# WORKER PROCESSES
+# ============================================================================
+
+# One simulation per process - keep BLAS/OpenMP from spawning threads on top
+_SINGLE_THREAD_ENV = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+def _init_worker():
+    """Ctrl+C is handled (and results saved) by the main process only"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _make_executor():
+    """
+    Process pool for the CPU-bound Monte Carlo work - sidesteps the GIL
+    Spawned, not forked: workers start while the download threads are running,
+    and forking a multi-threaded process can deadlock
+    """
+    # Inherited by the spawned workers, read when they import NumPy
+    for var in _SINGLE_THREAD_ENV:
+        os.environ.setdefault(var, '1')
+    return ProcessPoolExecutor(
+        max_workers=MAX_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker
+    )
 
-# Register signal handler
-signal.signal(signal.SIGINT, signal_handler)
+
+def _download_histories(batch, refresh):
+    """Batched price history for one batch - {} (per-ticker fallback) on failure"""
+    print(f"\n[Downloading price history for {len(batch)} tickers]")
+    try:
+        return get_history_batch(batch, HISTORICAL_WINDOW, refresh=refresh)
+    except Exception as e:
+        print(f"Warning: Batch download failed, falling back per ticker: {e}")
+        return {}
 
 # ============================================================================
 # MAIN
 # ============================================================================
 
 def main():
-    global RESULTS
-    
     print("\n" + "="*80)
     print("MONTE CARLO STOCK SCREENER - Enhanced with P/E & Z-Score")
     print("="*80)
     print("\nTIP: Press Ctrl+C to save partial results and exit")
     
+    # --refresh ignores today's cached downloads
+    refresh = '--refresh' in sys.argv[1:]
+    if refresh:
+        print("Refreshing cached data (--refresh)")
+    
+    # Yesterday's downloads are never read again - keep the cache to today's files
+    pruned = mc_cache.prune_stale()
+    if pruned:
+        print(f"Removed {pruned} stale cache files")
+    
     # Load tickers
     print(f"\nLoading tickers from: {TICKER_FILE}")
     tickers = load_tickers(TICKER_FILE)
     print(f"Found {len(tickers)} tickers")
     
+    # Fetch fundamentals up front - concurrent, network-bound
+    print(f"\nFetching fundamentals for {len(tickers)} tickers...")
+    fundamentals = prefetch_fundamentals(tickers, refresh=refresh)
+    
     # Run analysis
     print(f"\nRunning Monte Carlo analysis ({NUM_SIMULATIONS:,} simulations, {DAYS_TO_SIMULATE} days)")
     print("Now with: P/E ratios, Z-scores, and mean reversion signals")
     print("="*80)
     
-    save_interval = 100  # Save every 100 stocks
+    # Independent, reproducible random streams per ticker, whichever worker runs it
+    ticker_seeds = dict(zip(tickers, np.random.SeedSequence(SEED).spawn(len(tickers))))
     
-    for i, ticker in enumerate(tickers, 1):
-        print(f"[{i}/{len(tickers)}] {ticker}...", end=" ", flush=True)
-        
-        result = analyze_stock(
-            ticker,
-            days_to_simulate=DAYS_TO_SIMULATE,
-            num_simulations=NUM_SIMULATIONS,
-            historical_window=HISTORICAL_WINDOW
-        )
-        
-        if result['success']:
-            RESULTS.append(result)
-            
-            # Enhanced output with signal
-            signal_tag = f"[{result['signal']}]" if result['signal'] != 'NEUTRAL' else ""
-            z_score_str = f"Z={result['z_score']:.2f}" if result['z_score'] is not None else "Z=N/A"
-            pe_str = f"P/E={result['pe_ratio']:.1f}" if result['pe_ratio'] is not None else "P/E=N/A"
-            
-            # Add earnings warning if close
-            earnings_warning = ""
-            if result.get('days_to_earnings') is not None and result['days_to_earnings'] is not None:
-                days = result['days_to_earnings']
-                if 0 <= days <= 7:
-                    earnings_warning = f" ⚠️EARNINGS:{days}d"
-                elif -7 <= days < 0:
-                    earnings_warning = f" 📊REPORTED:{abs(days)}d ago"
+    with ScreenerRun(OUTPUT_FILE, save_interval=100) as run:
+        executor = _make_executor()
+        # One background thread downloads the next batch while this one simulates
+        downloader = ThreadPoolExecutor(max_workers=1)
+        try:
+            completed = 0
+            batches = [tickers[start:start + BATCH_SIZE] for start in range(0, len(tickers), BATCH_SIZE)]
+            next_histories = downloader.submit(_download_histories, batches[0], refresh) if batches else None
             
-            print(f"✓ {signal_tag} {z_score_str}, {pe_str}, drop={result['drop_from_high_pct']:.1f}%{earnings_warning}")
-        else:
-            print(f"✗ Failed")
-        
-        # Periodic save every 100 stocks
-        if i % save_interval == 0 and RESULTS:
-            print(f"\n[Auto-saving progress: {len(RESULTS)} stocks completed]")
-            try:
-                write_results_to_excel(RESULTS, OUTPUT_FILE)
-            except Exception as e:
-                print(f"Warning: Auto-save failed: {e}")
+            for i, batch in enumerate(batches):
+                # Price history for the whole batch comes from one request
+                histories = next_histories.result()
+                if i + 1 < len(batches):
+                    next_histories = downloader.submit(_download_histories, batches[i + 1], refresh)
+                
+                futures = {
+                    executor.submit(
+                        analyze_stock,
+                        ticker,
+                        days_to_simulate=DAYS_TO_SIMULATE,
+                        num_simulations=NUM_SIMULATIONS,
+                        historical_window=HISTORICAL_WINDOW,
+                        fundamentals=fundamentals.get(ticker),
+                        stock_data=histories.get(ticker),
+                        seed=ticker_seeds[ticker],
+                        refresh=refresh
+                    ): ticker
+                    for ticker in batch
+                }
+                
+                # Results are collected here on the main thread - no lock needed
+                for future in as_completed(futures):
+                    completed += 1
+                    ticker = futures[future]
+                    result = future.result()
+                    
+                    if result['success']:
+                        run.add(result)
+                        
+                        # Enhanced output with signal
+                        signal_tag = f"[{result['signal']}]" if result['signal'] != 'NEUTRAL' else ""
+                        z_score_str = f"Z={result['z_score']:.2f}" if result['z_score'] is not None else "Z=N/A"
+                        pe_str = f"P/E={result['pe_ratio']:.1f}" if result['pe_ratio'] is not None else "P/E=N/A"
+                        
+                        # Add earnings warning if close
+                        earnings_warning = ""
+                        if result.get('days_to_earnings') is not None and result['days_to_earnings'] is not None:
+                            days = result['days_to_earnings']
+                            if 0 <= days <= 7:
+                                earnings_warning = f" ⚠️EARNINGS:{days}d"
+                            elif -7 <= days < 0:
+                                earnings_warning = f" 📊REPORTED:{abs(days)}d ago"
+                        
+                        status = f"✓ {signal_tag} {z_score_str}, {pe_str}, drop={result['drop_from_high_pct']:.1f}%{earnings_warning}"
+                    else:
+                        status = "✗ Failed"
+                    
+                    # One write per ticker, so worker output can't split the line
+                    print(f"[{completed}/{len(tickers)}] {ticker}... {status}")
+                    
+                    # Periodic save every 100 stocks
+                    run.autosave(completed)
+        finally:
+            # On Ctrl+C or an error, drop queued tickers instead of waiting on them
+            executor.shutdown(wait=False, cancel_futures=True)
+            downloader.shutdown(wait=False, cancel_futures=True)
+    
+    results = run.results
     
     # Final save and analysis
     print("\n" + "="*80)
-    print(f"Successful: {len(RESULTS)}/{len(tickers)}")
+    print(f"Successful: {len(results)}/{len(tickers)}")
     
-    if RESULTS:
-        import pandas as pd
-        df = pd.DataFrame(RESULTS)
+    if results:
+        df = pd.DataFrame(results)
         
         # Show mean reversion opportunities
         print("\n" + "="*80)
         print("MEAN REVERSION OPPORTUNITIES (Value + Statistical Dislocation):")
         print("="*80)
         
+        # Screen columns as plain arrays - one fused mask per screen, no temporary Series
+        # Missing P/E becomes NaN, which fails every comparison below
+        signal_col = df['signal'].to_numpy()
+        pe = df['pe_ratio'].to_numpy(dtype=float, na_value=np.nan)
+        vol = df['volatility'].to_numpy(dtype=float)
+        drop = df['drop_from_high_pct'].to_numpy(dtype=float)
+        p10 = df['p10'].to_numpy(dtype=float)
+        
         # Oversold stocks with reasonable P/E
-        mean_reversion_long = df[
-            (df['signal'] == 'OVERSOLD') &           # Z-score < -2
-            (df['pe_ratio'].notna()) &                # Has P/E data
-            (df['pe_ratio'] > 0) &                    # Profitable
-            (df['pe_ratio'] < 30) &                   # Not overvalued
-            (df['volatility'] >= 15) &                # Enough vol for options
-            (df['volatility'] <= 40)                  # Not too crazy
-        ]
+        mean_reversion_mask = (
+            (signal_col == 'OVERSOLD') &              # Z-score < -2
+            (pe > 0) &                                # Has P/E data, profitable
+            (pe < 30) &                               # Not overvalued
+            (vol >= 15) &                             # Enough vol for options
+            (vol <= 40)                               # Not too crazy
+        )
+        mean_reversion_count = int(mean_reversion_mask.sum())
         
-        print(f"\nOversold + Reasonable Valuation: {len(mean_reversion_long)} candidates")
+        print(f"\nOversold + Reasonable Valuation: {mean_reversion_count} candidates")
         print(f"  Criteria: Z < -2, P/E 0-30, Vol 15-40%\n")
         
-        if len(mean_reversion_long) > 0:
+        if mean_reversion_count > 0:
             display_cols = ['ticker', 'signal', 'z_score', 'pe_ratio', 'current_price', 'drop_from_high_pct', 'p10']
-            display = mean_reversion_long[display_cols].head(20)
+            # Project and mask in one step - only the printed columns are copied
+            # Results arrive in completion order, so rank explicitly: most oversold first
+            display = df.loc[mean_reversion_mask, display_cols].sort_values('z_score').head(20)
             print(display.to_string(index=False))
         else:
             print("  None found matching all criteria")
@@ -153,23 +297,25 @@ def main():
         print("SELLING OPPORTUNITIES (Original Logic):")
         print("="*80)
         
-        selling_zone = df[
-            (df['drop_from_high_pct'] <= -10) &  # Already dropped 10%+
-            (df['p10'] >= -10) &                  # Limited forward downside
-            (df['p10'] <= -5) &
-            (df['volatility'] >= 15) &            # Enough vol for premium
-            (df['volatility'] <= 30)              # Not too crazy
-        ]
+        selling_zone_mask = (
+            (drop <= -10) &                       # Already dropped 10%+
+            (p10 >= -10) &                        # Limited forward downside
+            (p10 <= -5) &
+            (vol >= 15) &                         # Enough vol for premium
+            (vol <= 30)                           # Not too crazy
+        )
+        selling_zone_count = int(selling_zone_mask.sum())
         
-        print(f"\nFound {len(selling_zone)} candidates:")
+        print(f"\nFound {selling_zone_count} candidates:")
         print(f"  Criteria: Dropped 10%+, forward p10 -5% to -10%, vol 15-30%\n")
         
-        if len(selling_zone) > 0:
-            display = selling_zone[['ticker', 'current_price', 'drop_from_high_pct', 'p10', 'pe_ratio']].head(20)
+        if selling_zone_count > 0:
+            # Deepest drop from the 52-week high first
+            display = df.loc[selling_zone_mask, ['ticker', 'current_price', 'drop_from_high_pct', 'p10', 'pe_ratio']].sort_values('drop_from_high_pct').head(20)
             print(display.to_string(index=False))
         
-        # Write final Excel
-        write_results_to_excel(RESULTS, OUTPUT_FILE)
+        # Write final Excel (reuses the frame built above)
+        write_results_to_excel(df, OUTPUT_FILE)
     
     print("\n" + "="*80)
     print("DONE - Open Excel and filter by:")
@@ -5,10 +5,17 @@ Reads JSON ticker list, cuts 12k → ~2–4k in minutes
 
 import yfinance as yf
 import pandas as pd
-import json
 from pathlib import Path
 import math
 
+# orjson parses the multi-MB ticker JSON several times faster - optional
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
 INPUT_JSON = "/Users/jazzhashzzz/Documents/Market_Analysis_files/ticker.json"
 OUTPUT_TICKERS = "/Users/jazzhashzzz/Documents/Market_Analysis_files/ticker_filtered.txt"
 
@@ -19,17 +26,14 @@ MIN_AVG_VOL = 800_000
 
 def load_tickers_from_json(path):
     """Load tickers from JSON file"""
-    with open(path, 'r') as f:
-        data = json.load(f)
+    with open(path, 'rb') as f:
+        data = _json_loads(f.read())
     
     # Extract tickers from JSON structure
-    tickers = []
-    for key in data:
-        if 'ticker' in data[key]:
-            ticker = data[key]['ticker'].strip().upper()
-            tickers.append(ticker)
+    tickers = [entry['ticker'].strip().upper() for entry in data.values() if 'ticker' in entry]
     
-    return tickers
+    # Order-preserving dedupe (share classes can repeat a symbol)
+    return list(dict.fromkeys(tickers))
 
 
 def chunk(lst, n):
@@ -67,7 +71,7 @@ def main():
                 period="30d",
                 group_by="ticker",
                 auto_adjust=True,
-                threads=False,
+                threads=True,   # fetch the batch's symbols in parallel
                 progress=False
             )
         except Exception as e:
@@ -0,0 +1,68 @@
+"""On-disk cache for downloaded data - one pickle per key per day"""
+import os
+import pickle
+import threading
+from datetime import date
+from pathlib import Path
+
+CACHE_ENABLED = True
+CACHE_DIR = Path.home() / ".cache" / "mc_engine"
+
+
+def daily_cache_path(name):
+    """Cache file for today - files from earlier days are never read"""
+    return CACHE_DIR / f"{name}_{date.today():%Y%m%d}.pkl"
+
+
+def load_cached(name):
+    """Return today's cached object for name, or None if missing"""
+    if not CACHE_ENABLED:
+        return None
+
+    path = daily_cache_path(name)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def save_cached(name, obj):
+    """Write obj to today's cache file (atomic replace, safe across threads)"""
+    if not CACHE_ENABLED:
+        return
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = daily_cache_path(name)
+    tmp_path = path.with_suffix(f'.{os.getpid()}_{threading.get_ident()}.tmp')
+
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def prune_stale():
+    """
+    Delete cache files from earlier days (never read again)
+    Also removes earlier days' .tmp files left behind by interrupted saves -
+    today's are skipped, they may belong to a save still in progress
+    Returns the number of files removed
+    """
+    if not CACHE_DIR.exists():
+        return 0
+
+    # Cache files end in _YYYYMMDD.pkl, temp files in _YYYYMMDD.<pid>_<tid>.tmp
+    today_stamp = f"_{date.today():%Y%m%d}."
+    removed = 0
+    for path in CACHE_DIR.iterdir():
+        if path.suffix not in ('.pkl', '.tmp') or today_stamp in path.name:
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            pass
+    return removed
@@ -2,12 +2,33 @@
 import yfinance as yf
 import pandas as pd
 from datetime import date, timedelta
+import mc_cache
 
-def download_data(stock_symbol, historical_window):
-    """Download historical price data from yfinance"""
-    print("\nDownloading historical data...")
+def history_start_date(historical_window):
+    """First calendar date needed to cover historical_window trading days (plus buffer)"""
     calendar_days = int(historical_window * (365/252)) + 100
-    start_date = date.today() - timedelta(days=calendar_days)
+    return date.today() - timedelta(days=calendar_days)
+
+def history_cache_name(stock_symbol, historical_window):
+    """mc_cache key for a symbol's price history (shared with the screener's batch cache)"""
+    return f"history_{historical_window}_{stock_symbol.replace('/', '_')}"
+
+def download_data(stock_symbol, historical_window, refresh=False, verbose=True):
+    """
+    Download historical price data from yfinance
+    Today's download is cached on disk - refresh=True fetches it again
+    """
+    cache_name = history_cache_name(stock_symbol, historical_window)
+    if not refresh:
+        cached = mc_cache.load_cached(cache_name)
+        if cached is not None:
+            if verbose:
+                print("\nUsing today's cached historical data...")
+            return cached
+    
+    if verbose:
+        print("\nDownloading historical data...")
+    start_date = history_start_date(historical_window)
     
     stock_data = yf.download(stock_symbol, start=start_date, progress=False, auto_adjust=True)
     
@@ -18,18 +39,22 @@ def download_data(stock_symbol, historical_window):
     if isinstance(stock_data.columns, pd.MultiIndex):
         stock_data.columns = stock_data.columns.get_level_values(0)
     
+    mc_cache.save_cached(cache_name, stock_data)
     return stock_data
 
-def set_starting_prices(stock_data, stock_symbol, custom_stock_price=None):
+def set_starting_prices(stock_data, stock_symbol, custom_stock_price=None, verbose=True):
     """Set starting prices from custom values or current market prices"""
-    print("\nSetting starting prices...")
+    if verbose:
+        print("\nSetting starting prices...")
     
     if custom_stock_price is not None:
         stock_price = custom_stock_price
-        print(f"  Using custom {stock_symbol} price: ${custom_stock_price:.2f}")
+        if verbose:
+            print(f"  Using custom {stock_symbol} price: ${custom_stock_price:.2f}")
     else:
         close_value = stock_data['Close'].iloc[-1]
         stock_price = float(close_value.item() if hasattr(close_value, 'item') else close_value)
-        print(f"  Using current {stock_symbol} price: ${stock_price:.2f}")
+        if verbose:
+            print(f"  Using current {stock_symbol} price: ${stock_price:.2f}")
     
     return stock_price
\ No newline at end of file
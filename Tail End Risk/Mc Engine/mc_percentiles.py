@@ -2,9 +2,15 @@
 import numpy as np
 import pandas as pd
 
-def calculate_percentiles(stock_final_returns, stock_final_prices=None):
-    """Calculate percentile statistics"""
-    print("\nCalculating percentiles...")
+def calculate_percentiles(stock_final_returns, stock_final_prices=None, verbose=True,
+                          stock_price=None):
+    """
+    Calculate percentile statistics
+    With stock_price, price percentiles are mapped from the return ones
+    (returns are an increasing affine map of prices) - one selection pass
+    """
+    if verbose:
+        print("\nCalculating percentiles...")
     
     percentiles = [1, 5, 10, 25, 50, 75, 90, 95, 99]
     
@@ -14,22 +20,48 @@ def calculate_percentiles(stock_final_returns, stock_final_prices=None):
     })
     
     # Add price percentiles if prices are provided
-    if stock_final_prices is not None:
+    if stock_price is not None:
+        stock_percentiles['price'] = stock_price * (1 + stock_percentiles['return'].to_numpy() / 100)
+    elif stock_final_prices is not None:
         stock_percentiles['price'] = np.percentile(stock_final_prices, percentiles)
     
     return stock_percentiles
 
 def calculate_cvar(returns):
-    """Calculate Conditional Value at Risk (CVaR) / Expected Shortfall"""
-    var_95 = np.percentile(returns, 5)
-    var_99 = np.percentile(returns, 1)
+    """
+    Calculate Conditional Value at Risk (CVaR) / Expected Shortfall
+    One partition serves both levels - no boolean masks or tail copies
+    """
+    returns = np.asarray(returns)
+    n = returns.size
     
-    cvar_95 = returns[returns <= var_95].mean()
-    cvar_99 = returns[returns <= var_99].mean()
+    # Order statistics bracketing each level, as np.percentile's linear method
+    pos_95 = 0.05 * (n - 1)
+    pos_99 = 0.01 * (n - 1)
+    k_95, k_99 = int(pos_95), int(pos_99)
+    kth = sorted({k_99, min(k_99 + 1, n - 1), k_95, min(k_95 + 1, n - 1)})
+    part = np.partition(returns, kth)
+    
+    var_95 = _interpolate(part, k_95, pos_95 - k_95)
+    var_99 = _interpolate(part, k_99, pos_99 - k_99)
+    
+    # Everything left of kth index k is <= part[k], so the tail is a prefix
+    cvar_95 = part[:k_95 + 1].mean()
+    cvar_99 = part[:k_99 + 1].mean()
     
     return {
         'var_95': var_95,
         'cvar_95': cvar_95,
         'var_99': var_99,
         'cvar_99': cvar_99
-    }
\ No newline at end of file
+    }
+
+def _interpolate(part, k, frac):
+    """Linear interpolation between partitioned order statistics k and k+1"""
+    if frac == 0 or k + 1 >= part.size:
+        return part[k]
+    lo, hi = part[k], part[k + 1]
+    # Same two-sided lerp numpy uses, so results match np.percentile
+    if frac >= 0.5:
+        return hi - (hi - lo) * (1 - frac)
+    return lo + (hi - lo) * frac
@@ -3,7 +3,8 @@ import numpy as np
 def calculate_risk_state_score(
     stock_data,
     final_returns,
-    stock_cvar
+    stock_cvar,
+    stock_percentiles=None
 ):
     """
     Build 4-component Risk State Score:
@@ -11,15 +12,22 @@ def calculate_risk_state_score(
     2. Tail thickness ratio
     3. Jump intensity proxy
     4. Distribution width
+    Pass the calculate_percentiles table to reuse its p5/p95
     """
 
     # =====================================
     # 1. Volatility Regime Ratio
     # =====================================
-    returns = stock_data['Close'].pct_change().dropna()
+    # Daily returns as a plain array (same values as pct_change().dropna())
+    closes = np.asarray(stock_data['Close'], dtype=float).ravel()
+    returns = closes[1:] / closes[:-1] - 1
+    returns = returns[np.isfinite(returns)]
 
-    vol_20 = returns.rolling(20).std().iloc[-1] * np.sqrt(252)
-    vol_100 = returns.rolling(100).std().iloc[-1] * np.sqrt(252)
+    # Only the latest window is used - reduce over the tail instead of
+    # building the full rolling series (NaN when history is too short,
+    # matching rolling().iloc[-1])
+    vol_20 = (returns[-20:].std(ddof=1) if len(returns) >= 20 else np.nan) * np.sqrt(252)
+    vol_100 = (returns[-100:].std(ddof=1) if len(returns) >= 100 else np.nan) * np.sqrt(252)
 
     vol_ratio = vol_20 / vol_100 if vol_100 != 0 else 1.0
 
@@ -54,8 +62,12 @@ def calculate_risk_state_score(
     # =====================================
     # 4. Distribution Width
     # =====================================
-    p95 = np.percentile(final_returns, 95)
-    p5 = np.percentile(final_returns, 5)
+    if stock_percentiles is not None:
+        pct = stock_percentiles.set_index('percentile')['return']
+        p5, p95 = pct.loc[5], pct.loc[95]
+    else:
+        # One selection pass for both tails
+        p5, p95 = np.percentile(final_returns, [5, 95])
 
     width = abs(p95 - p5)
 
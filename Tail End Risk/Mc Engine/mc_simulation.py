@@ -9,6 +9,9 @@ Adds:
 
 import numpy as np
 
+# Per-day price percentiles kept for the path chart
+PATH_PERCENTILES = [5, 25, 50, 75, 95]
+
 
 def run_single_simulation(
     stock_price,
@@ -19,111 +22,163 @@ def run_single_simulation(
     jump_prob=0.0,
     jump_magnitude=0.0,
     df=5,              # Student-t degrees of freedom
-    lambda_=0.94       # EWMA decay factor
+    lambda_=0.94,      # EWMA decay factor
+    rng=None,          # numpy Generator to draw from (defaults to a fresh one)
+    path_percentiles=None  # Price-path percentile curves to track per day
 ):
     """
     Run Monte Carlo block with:
     - Student-t shocks
     - Time-varying EWMA volatility
     - Jump process
+    Paths are never stored - only the requested per-day percentile
+    curves ({percentile: price array}) and the final prices are kept
+    sigma may be a list of scenario vols: every scenario then runs on the
+    same shocks (common random numbers), final arrays gain a leading
+    scenario axis and the percentile curves follow the first scenario
     """
+    if rng is None:
+        rng = np.random.default_rng()
 
     # ==============================
     # 1. Student-t shocks
     # ==============================
-    z = np.random.standard_t(df, size=(days_to_simulate, num_simulations))
+    z = rng.standard_t(df, size=(days_to_simulate, num_simulations))
     
     # Scale to unit variance
     z = z / np.sqrt(df / (df - 2))
 
     # ==============================
-    # 2. EWMA Volatility Clustering
-    # ==============================
-    sigma_t = np.zeros((days_to_simulate, num_simulations))
-    sigma_t[0] = sigma
-
-    for t in range(1, days_to_simulate):
-        sigma_t[t] = np.sqrt(
-            lambda_ * sigma_t[t-1]**2 +
-            (1 - lambda_) * (sigma_t[t-1] * z[t-1])**2
-        )
-
-    # ==============================
-    # 3. Drift + Stochastic Vol
-    # ==============================
-    daily_returns = (
-        mu / 252 +
-        sigma_t / np.sqrt(252) * z
-    )
-
-    # ==============================
-    # 4. Distributed Jump Process
+    # 2. Distributed jump draws
     # ==============================
+    jump_matrix = None
     if jump_prob > 0:
-        jump_matrix = np.random.rand(days_to_simulate, num_simulations) < jump_prob
-        daily_returns[jump_matrix] += jump_magnitude
+        jump_matrix = rng.random((days_to_simulate, num_simulations)) < jump_prob
 
     # ==============================
-    # 5. Price Path Construction
+    # 3. Fused day loop
     # ==============================
-    paths = stock_price * np.cumprod(1 + daily_returns, axis=0)
-    final_prices = paths[-1]
-    final_returns = (final_prices / stock_price - 1) * 100
+    # EWMA vol clustering, drift + stochastic vol, jumps and price
+    # compounding advance one day at a time over N-vectors - no
+    # (T, N) sigma, return or path matrices and a single pass over the shocks
+    # Per-step constants hoisted out of the loop
+    daily_drift = mu / 252
+    daily_scale = 1 / np.sqrt(252)
+    ewma_mix = 1 - lambda_
+
+    # Shape (N,) for one vol, (scenarios, N) for a ladder
+    sigma = np.asarray(sigma, dtype=float)
+    sigma_t = np.repeat(sigma[..., None], num_simulations, axis=-1)
+    growth = np.ones_like(sigma_t)
+    base_growth = growth if growth.ndim == 1 else growth[0]
+
+    if path_percentiles is not None:
+        curves = np.empty((days_to_simulate, len(path_percentiles)))
+
+    # Day buffers allocated once and refilled in place (out=) every step
+    daily_returns = np.empty_like(sigma_t)
+    vol_factor = np.empty(num_simulations)
+
+    for t in range(days_to_simulate):
+        z_t = z[t]
+
+        # daily_drift + daily_scale * sigma_t * z_t
+        np.multiply(sigma_t, daily_scale, out=daily_returns)
+        daily_returns *= z_t
+        daily_returns += daily_drift
+        if jump_matrix is not None:
+            np.add(daily_returns, jump_magnitude, out=daily_returns, where=jump_matrix[t])
+
+        daily_returns += 1
+        growth *= daily_returns
+
+        # Cross-section of today's prices (percentiles scale with stock_price)
+        if path_percentiles is not None:
+            curves[t] = np.percentile(base_growth, path_percentiles)
+
+        # EWMA update feeds tomorrow's vol
+        # sqrt(l*s^2 + (1-l)*(s*z)^2) == s * sqrt(l + (1-l)*z^2) for s > 0
+        # The factor only depends on the shock, so it is shared by all scenarios
+        np.multiply(z_t, z_t, out=vol_factor)
+        vol_factor *= ewma_mix
+        vol_factor += lambda_
+        np.sqrt(vol_factor, out=vol_factor)
+        sigma_t *= vol_factor
+
+    final_prices = stock_price * growth
+    # (final / start - 1) * 100 straight from growth, written into the spent day buffer
+    final_returns = np.subtract(growth, 1, out=daily_returns)
+    final_returns *= 100
+
+    path_curves = None
+    if path_percentiles is not None:
+        path_curves = {
+            p: stock_price * curves[:, i]
+            for i, p in enumerate(path_percentiles)
+        }
 
-    return paths, final_prices, final_returns
+    return path_curves, final_prices, final_returns
 
 
-def run_monte_carlo(stock_price, stats, days_to_simulate, num_simulations):
+def run_monte_carlo(stock_price, stats, days_to_simulate, num_simulations, seed=42, verbose=True):
     """
     Run base simulation + volatility stress scenarios.
+    seed: int, np.random.SeedSequence (e.g. a spawned child) or None for fresh entropy
     """
 
-    print(f"\nRunning {num_simulations:,} Monte Carlo simulations...")
-    np.random.seed(42)
+    if verbose:
+        print(f"\nRunning {num_simulations:,} Monte Carlo simulations...")
+    # Seeded per call rather than globally so threads don't share state
+    # PCG64 Generator - its t and uniform draws run well ahead of legacy mtrand
+    rng = np.random.default_rng(seed)
 
     mu = stats['stock_expected_return']
     base_sigma = stats['stock_volatility']
 
     # Volatility stress ladder
     vol_multipliers = [1.0, 1.25, 1.5]
+    sigmas = [base_sigma * multiplier for multiplier in vol_multipliers]
+
+    # One pass for the whole ladder - every scenario sees the same shocks and
+    # jumps, so stress rows differ only by vol (and the draws are paid once)
+    path_curves, final_prices, final_returns = run_single_simulation(
+        stock_price,
+        mu,
+        sigmas,
+        days_to_simulate,
+        num_simulations,
+        jump_prob=0.02,       # 2% daily jump probability
+        jump_magnitude=-0.04, # -4% shock
+        df=5,
+        lambda_=0.94,
+        rng=rng,
+        # Only the base case (first row) feeds the price-path chart
+        path_percentiles=PATH_PERCENTILES
+    )
 
     results = {}
 
-    for multiplier in vol_multipliers:
-        sigma = base_sigma * multiplier
-
-        print(f"\n  → Volatility Stress: {multiplier:.2f}x ({sigma*100:.2f}%)")
-
-        paths, final_prices, final_returns = run_single_simulation(
-            stock_price,
-            mu,
-            sigma,
-            days_to_simulate,
-            num_simulations,
-            jump_prob=0.02,       # 2% daily jump probability
-            jump_magnitude=-0.04, # -4% shock
-            df=5,
-            lambda_=0.94
-        )
+    for i, (multiplier, sigma) in enumerate(zip(vol_multipliers, sigmas)):
+        # Quick tail metrics - kept so the dashboard doesn't recompute them
+        p5, p1 = np.percentile(final_returns[i], [5, 1])
 
         results[multiplier] = {
-            "stock_paths": paths,
-            "stock_final_prices": final_prices,
-            "stock_final_returns": final_returns
+            "stock_path_percentiles": path_curves if i == 0 else None,
+            "stock_final_prices": final_prices[i],
+            "stock_final_returns": final_returns[i],
+            "tail_percentiles": {5: p5, 1: p1}
         }
 
-        # Quick tail metrics
-        p5 = np.percentile(final_returns, 5)
-        p1 = np.percentile(final_returns, 1)
-
-        print(f"     5th percentile return:  {p5:.2f}%")
-        print(f"     1st percentile return:  {p1:.2f}%")
+        if verbose:
+            print(f"\n  → Volatility Stress: {multiplier:.2f}x ({sigma*100:.2f}%)")
+            print(f"     5th percentile return:  {p5:.2f}%")
+            print(f"     1st percentile return:  {p1:.2f}%")
 
     # Return base case for compatibility
     base_case = results[1.0]
 
     return {
-        "stock_paths": base_case["stock_paths"],
+        "stock_path_percentiles": base_case["stock_path_percentiles"],
         "stock_final_prices": base_case["stock_final_prices"],
         "stock_final_returns": base_case["stock_final_returns"],
         "stress_results": results
@@ -1,21 +1,24 @@
 """Statistics calculations"""
 import numpy as np
-import pandas as pd
 
-def calculate_statistics(stock_data, historical_window, stock_symbol, risk_free_rate=0.042):
+def calculate_statistics(stock_data, historical_window, stock_symbol, risk_free_rate=0.042, verbose=True):
     """
     Calculate volatility and use risk-free rate as drift proxy.
     """
-    print("\nCalculating statistics...")
+    if verbose:
+        print("\nCalculating statistics...")
     
-    stock_prices = stock_data['Close'].iloc[-historical_window:]
-    stock_returns = stock_prices.pct_change().dropna()
+    # Plain float64 array - the reductions skip pandas index/dispatch overhead
+    stock_prices = np.asarray(stock_data['Close'], dtype=float).ravel()[-historical_window:]
+    stock_returns = stock_prices[1:] / stock_prices[:-1] - 1
+    stock_returns = stock_returns[np.isfinite(stock_returns)]
     
-    stock_volatility = stock_returns.std() * np.sqrt(252)
+    stock_volatility = float(stock_returns.std(ddof=1)) * np.sqrt(252)
     stock_expected_return = risk_free_rate  # Use risk-free proxy
     
-    print(f"  {stock_symbol} volatility: {stock_volatility*100:.2f}%")
-    print(f"  Risk-free proxy (drift): {stock_expected_return*100:.2f}%")
+    if verbose:
+        print(f"  {stock_symbol} volatility: {stock_volatility*100:.2f}%")
+        print(f"  Risk-free proxy (drift): {stock_expected_return*100:.2f}%")
     
     return {
         'stock_volatility': stock_volatility,
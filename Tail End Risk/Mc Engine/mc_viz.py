@@ -1,6 +1,8 @@
 """Enhanced Visualization functions — Full Risk Dashboard"""
 
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Dashboard is only saved to disk, never shown
 import matplotlib.pyplot as plt
 from datetime import datetime
 from pathlib import Path
@@ -67,7 +69,8 @@ def create_visualization(data):
     filename = f'monte_carlo_dashboard_{data["stock_symbol"]}_{timestamp}.png'
     output_path = output_dir / filename
 
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    # 150 dpi is plenty for an on-screen dashboard and encodes ~4x fewer pixels
+    plt.savefig(output_path, dpi=150, bbox_inches='tight')
     plt.close()
 
     return str(output_path)
@@ -79,24 +82,24 @@ def create_visualization(data):
 
 def _plot_price_paths(ax, data):
 
-    paths = data["stock_paths"]
+    # Per-day percentile curves come precomputed from the simulation
+    curves = data["stock_path_percentiles"]
     starting_price = data["stock_price"]
     days = data["days_to_simulate"]
 
-    normalized = (paths / starting_price) * 100
-    percentiles = [5, 25, 50, 75, 95]
+    normalized = {p: (curve / starting_price) * 100 for p, curve in curves.items()}
 
-    for p in percentiles:
+    for p, curve in normalized.items():
         ax.plot(
-            np.percentile(normalized, p, axis=1),
+            curve,
             linewidth=2,
             label=f'{p}th'
         )
 
     ax.fill_between(
         range(days),
-        np.percentile(normalized, 5, axis=1),
-        np.percentile(normalized, 95, axis=1),
+        normalized[5],
+        normalized[95],
         alpha=0.2
     )
 
@@ -115,12 +118,14 @@ def _plot_price_paths(ax, data):
 def _plot_return_distribution(ax, data):
 
     returns = data["stock_final_returns"]
+    pct = data["stock_percentiles"].set_index("percentile")["return"]
 
-    ax.hist(returns, bins=100, alpha=0.7)
+    # Bin with NumPy and draw one filled step patch instead of 100 bar artists
+    counts, edges = np.histogram(returns, bins=100)
+    ax.stairs(counts, edges, fill=True, alpha=0.7)
 
-    p5 = np.percentile(returns, 5)
-    p1 = np.percentile(returns, 1)
-    median = np.percentile(returns, 50)
+    # Markers come from the precomputed percentile table
+    p5, p1, median = pct.loc[5], pct.loc[1], pct.loc[50]
 
     ax.axvline(p5, linestyle='--', linewidth=2, label="5th")
     ax.axvline(p1, linestyle='--', linewidth=2, label="1st")
@@ -144,10 +149,8 @@ def _plot_percentile_table(ax, data):
     table_data = []
     df = data["stock_percentiles"]
 
-    for _, row in df.iterrows():
-        p = int(row["percentile"])
-        r = row["return"]
-        table_data.append([f"{p}th", f"{r:.2f}%"])
+    for p, r in zip(df["percentile"].to_numpy(), df["return"].to_numpy()):
+        table_data.append([f"{int(p)}th", f"{r:.2f}%"])
 
     table = ax.table(
         cellText=table_data,
@@ -224,9 +227,11 @@ def _plot_stress_distributions(ax, data):
         if returns is None or len(returns) == 0:
             continue
 
-        ax.hist(
-            returns,
-            bins=80,
+        counts, edges = np.histogram(returns, bins=80)
+        ax.stairs(
+            counts,
+            edges,
+            fill=True,
             alpha=0.4,
             label=f"{mult}x Vol"
         )
@@ -273,8 +278,12 @@ def _plot_stress_tail_shift(ax, data):
         if returns is None or len(returns) == 0:
             continue
 
-        p5 = np.percentile(returns, 5)
-        p1 = np.percentile(returns, 1)
+        # Tails were already measured by the simulation
+        tails = result.get("tail_percentiles")
+        if tails is not None:
+            p5, p1 = tails[5], tails[1]
+        else:
+            p5, p1 = np.percentile(returns, [5, 1])
 
         rows.append([
             f"{mult}x",
@@ -322,12 +331,16 @@ def _plot_strike_guide(ax, data):
 
     table_data = []
 
-    for _, row in df.iterrows():
-        p = int(row["percentile"])
-        r = row["return"]
+    # Sort once - each "finish below" probability is then a binary search
+    percentiles = df["percentile"].to_numpy()
+    levels = df["return"].to_numpy()
+    counts_below = np.searchsorted(np.sort(returns), levels, side='right')
+
+    for p, r, count in zip(percentiles, levels, counts_below):
+        p = int(p)
 
         strike = current_price * (1 + r / 100)
-        prob_below = (returns <= r).mean() * 100
+        prob_below = count / len(returns) * 100
 
         table_data.append([
             f"{p}th",
@@ -121,11 +121,13 @@ try:
         
         # Distance from percentile boundaries
         print(f"\nPercentile boundaries for reference:")
-        p1 = engine.stock_percentiles[engine.stock_percentiles['percentile'] == 1]['price'].values[0]
-        p5 = engine.stock_percentiles[engine.stock_percentiles['percentile'] == 5]['price'].values[0]
-        p10 = engine.stock_percentiles[engine.stock_percentiles['percentile'] == 10]['price'].values[0]
-        p25 = engine.stock_percentiles[engine.stock_percentiles['percentile'] == 25]['price'].values[0]
-        p50 = engine.stock_percentiles[engine.stock_percentiles['percentile'] == 50]['price'].values[0]
+        # Index once, then plain lookups instead of a mask per percentile
+        price_at = engine.stock_percentiles.set_index('percentile')['price']
+        p1 = price_at.loc[1]
+        p5 = price_at.loc[5]
+        p10 = price_at.loc[10]
+        p25 = price_at.loc[25]
+        p50 = price_at.loc[50]
         
         print(f"  1st percentile:  ${p1:.2f}")
         print(f"  5th percentile:  ${p5:.2f}")